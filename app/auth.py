@@ -1,13 +1,17 @@
 # app/auth.py
 from fastapi import HTTPException, Depends, Header
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
-from app.crud import get_user_by_pat  # Still import from crud, which is OK now.
+from app.crud import get_user_by_pat_cached
 
-def get_api_key(x_pat: str = Header(..., alias="X-Azure-DevOps-PAT"), db: Session = Depends(get_db)):
-    # Implement your logic to look up the user by the provided PAT.
-    # For example, you might have a function get_user_by_pat(x_pat)
-    user = get_user_by_pat(db, x_pat)
+async def authenticate(x_pat: str = Header(..., alias="X-Azure-DevOps-PAT"), db: AsyncSession = Depends(get_db)):
+    """
+    The single authentication dependency for protected endpoints: resolves the
+    X-Azure-DevOps-PAT header to a user through the cached fingerprint lookup.
+    Endpoints that also need the database declare get_db themselves; FastAPI
+    caches it per request, so they share this dependency's session.
+    """
+    user = await get_user_by_pat_cached(db, x_pat)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid API key")
-    return user
\ No newline at end of file
+    return user
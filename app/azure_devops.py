@@ -1,18 +1,76 @@
 # app/azure_devops.py
+import asyncio
 import base64
-from app.config import AZURE_DEVOPS_PAT, AZURE_DEVOPS_ORG, AZURE_DEVOPS_PROJECT, API_VERSION
+from typing import Callable, List, Sequence, Union
 
-def get_auth_headers(pat: str = None) -> dict:
+import httpx
+from fastapi import Request
+
+from app.cache import auth_header_cache
+from app.config import get_settings
+# Azure DevOps accepts at most 200 IDs per work items details request.
+WORK_ITEMS_BATCH_SIZE = 200
+# Upper bound on concurrent chunk requests per call, to stay clear of Azure DevOps rate limits.
+MAX_CONCURRENT_CHUNKS = 8
+
+def encode_basic_auth(pat: str) -> str:
+    """
+    Build the "Basic ..." authorization value for a PAT.
+    """
+    token = f":{pat}"
+    encoded_token = base64.b64encode(token.encode("utf-8")).decode("utf-8")
+    return f"Basic {encoded_token}"
+
+def get_auth_headers(pat: str = None, pat_fingerprint: bytes = None) -> dict:
     """
     Create the basic authentication header.
     If a PAT is provided, use it; otherwise, use the default from configuration.
+    When the caller's PAT fingerprint is given, the encoded value is cached under it.
+    A fresh dict is returned on every call, so callers may add headers to it.
     """
-    token = f":{pat or AZURE_DEVOPS_PAT}"
-    encoded_token = base64.b64encode(token.encode("utf-8")).decode("utf-8")
-    return {"Authorization": f"Basic {encoded_token}"}
+    if pat_fingerprint is None:
+        return {"Authorization": encode_basic_auth(pat or get_settings().azure_devops_pat)}
+    authorization = auth_header_cache.get(pat_fingerprint)
+    if authorization is None:
+        authorization = encode_basic_auth(pat)
+        auth_header_cache.set(pat_fingerprint, authorization)
+    return {"Authorization": authorization}
+
+def escape_wiql_literal(value: str) -> str:
+    """
+    Escape a value for use inside a single-quoted WIQL string literal.
+    """
+    return value.replace("'", "''")
 
 def get_base_url(config) -> str:
     """
     Construct the base URL for Azure DevOps API calls.
     """
-    return f"https://dev.azure.com/{config['azure_devops_org']}/{config['azure_devops_project']}"
\ No newline at end of file
+    return f"https://dev.azure.com/{config['azure_devops_org']}/{config['azure_devops_project']}"
+
+def get_http_client(request: Request) -> httpx.AsyncClient:
+    """
+    Return the shared Azure DevOps HTTP client created at application startup.
+    """
+    return request.app.state.http
+
+
+async def get_in_chunks(
+        client: httpx.AsyncClient,
+        build_url: Callable[[Sequence[Union[int, str]]], str],
+        ids: Sequence[Union[int, str]],
+        headers: dict
+) -> List[httpx.Response]:
+    """
+    Split the IDs into chunks of WORK_ITEMS_BATCH_SIZE and GET the URL built for
+    each chunk concurrently. Responses are returned in chunk order.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_CHUNKS)
+
+    async def fetch(chunk: Sequence[Union[int, str]]) -> httpx.Response:
+        async with semaphore:
+            return await client.get(build_url(chunk), headers=headers)
+
+    return await asyncio.gather(*(
+        fetch(ids[i:i + WORK_ITEMS_BATCH_SIZE]) for i in range(0, len(ids), WORK_ITEMS_BATCH_SIZE)
+    ))
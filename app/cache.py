@@ -0,0 +1,79 @@
+# app/cache.py
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from cachetools import TTLCache
+
+
+class TTLStore:
+    """
+    A small thread-safe TTL + LRU cache. Endpoints use it from the event loop, but
+    TTLCache is not safe for concurrent use, so access stays behind an uncontended
+    lock in case it is ever reached from a worker thread (run_in_executor, sync code).
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            return self._cache.get(key, default)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._cache[key] = value
+
+    def pop(self, key: Hashable) -> Any:
+        with self._lock:
+            return self._cache.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+class RequestCoalescer:
+    """
+    Deduplicates concurrent identical async calls: the first caller for a key starts
+    the call and every caller that arrives while it is in flight awaits the same task.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so a cancelled caller doesn't cancel the call for everyone else.
+        return await asyncio.shield(task)
+
+
+# Authenticated users, keyed by PAT fingerprint.
+user_cache = TTLStore(maxsize=1024, ttl=60)
+
+# Encoded Azure DevOps "Basic ..." authorization values, keyed by PAT fingerprint so
+# the raw PAT is never held as a cache key.
+auth_header_cache = TTLStore(maxsize=1024, ttl=3600)
+
+# Azure DevOps work items, keyed by (user id, org, project, work item id) so
+# entries never leak across users or tenants. An entry is only served while its rev is
+# at least work_item_revs' rev for the item, so an update made through this API is seen
+# by every user at once; changes made directly in Azure DevOps can be served stale for
+# up to the TTL (300s).
+work_item_cache = TTLStore(maxsize=4096, ttl=300)
+
+# Newest rev returned by a PATCH through this API, keyed by (org, work item id); work
+# item IDs are unique per organization. Outlives work_item_cache entries on purpose.
+work_item_revs = TTLStore(maxsize=4096, ttl=300)
+
+# Non-secret user configuration (GET /config and work item endpoints), keyed by user id.
+config_cache = TTLStore(maxsize=10_000, ttl=300)
+
+# In-flight Azure DevOps work item fetches, keyed like work_item_cache plus the
+# requested fields projection.
+work_item_requests = RequestCoalescer()
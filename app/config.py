@@ -1,20 +1,34 @@
 # app/config.py
-import os
-from dotenv import load_dotenv
+from functools import lru_cache
 
-# Load environment variables from .env file
-load_dotenv()
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
-# Azure DevOps configuration
-AZURE_DEVOPS_ORG = os.getenv("AZURE_DEVOPS_ORG", "your-org")
-AZURE_DEVOPS_PROJECT = os.getenv("AZURE_DEVOPS_PROJECT", "your-project")
-AZURE_DEVOPS_PAT = os.getenv("AZURE_DEVOPS_PAT", "your-pat")
-API_VERSION = os.getenv("API_VERSION", "7.1-preview.7")
 
-# Application secrets and database URL
-SECRET_KEY = os.getenv("SECRET_KEY", "supersecretkey")
-DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://postgres:z5DIOIL2hs2s8kTZWn855O@db:5432/users_db")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+class Settings(BaseSettings):
+    """
+    Application settings, read once from the environment and the .env file.
+    """
+    # Azure DevOps configuration
+    azure_devops_org: str = "your-org"
+    azure_devops_project: str = "your-project"
+    azure_devops_pat: str = "your-pat"
+    api_version: str = "7.1-preview.7"
 
-# Add ALGORITHM so it can be imported by other modules
-ALGORITHM = os.getenv("ALGORITHM", "HS256")
\ No newline at end of file
+    # Application secrets and database URL
+    secret_key: str = "supersecretkey"
+    database_url: str = "postgresql://postgres:z5DIOIL2hs2s8kTZWn855O@db:5432/users_db"
+    access_token_expire_minutes: int = 30
+    algorithm: str = "HS256"
+
+    # Create missing tables at startup; turn off where Alembic manages the schema
+    run_migrations: bool = True
+
+    # Minimum level written to app.log (e.g. WARNING in production)
+    log_file_level: str = "INFO"
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
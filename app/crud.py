@@ -1,36 +1,153 @@
 # app/crud.py
-from typing import Optional
+import asyncio
+import hmac
+from concurrent.futures import Executor
+from typing import NamedTuple, Optional
 
-from sqlalchemy.orm import Session
-from app.models import UserModel
+from sqlalchemy import Row, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache import user_cache
+from app.models import UserModel, UserConfig
 from app.schemas import UserCreate
-from app.utils import get_password_hash, verify_password, compute_pat_fingerprint  # Import password utility from utils
+from app.utils import get_password_hash, compute_pat_fingerprint  # Import password utility from utils
 
-def get_user_by_username(db: Session, username: str):
-    return db.query(UserModel).filter(UserModel.username == username).first()
+# Configuration columns that are safe to return to clients (everything but the PAT).
+CONFIG_COLUMNS = (UserConfig.azure_devops_org, UserConfig.azure_devops_project, UserConfig.api_version)
 
-def get_user_by_pat(db: Session, pat: str) -> Optional[UserModel]:
+
+class CachedUser(NamedTuple):
+    """Plain snapshot of an authenticated user, safe to keep outside of a DB session."""
+    id: int
+    username: str
+    pat_fingerprint: bytes
+    config: Optional[dict]
+
+
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[Row]:
+    """
+    Return only (id, username, hashed_password) for the user, without building a UserModel.
     """
-    Quickly query for a user by computing a fingerprint of the provided PAT.
-    Then verify the full (salted) hashed password using the secure verification function.
+    result = await db.execute(
+        select(UserModel.id, UserModel.username, UserModel.hashed_password)
+        .where(UserModel.username == username)
+    )
+    return result.first()
+
+async def get_user_by_pat_cached(db: AsyncSession, pat: str) -> Optional[CachedUser]:
+    """
+    Look up a user by the keyed fingerprint of the provided PAT; the fingerprint match is
+    the authentication, so a miss is a single unique-index probe. Results are served from
+    an in-process TTL cache keyed by the fingerprint, so repeated requests skip the database.
     """
     fingerprint = compute_pat_fingerprint(pat)
-    user = db.query(UserModel).filter(UserModel.pat_fingerprint == fingerprint).first()
-    if user and verify_password(pat, user.hashed_password):
-        return user
-    return None
+    cached = user_cache.get(fingerprint)
+    if cached is not None:
+        return cached
+    # One outer-joined, column-only SELECT: the user and the non-secret config columns,
+    # never the stored PAT or full ORM entities.
+    result = await db.execute(
+        select(
+            UserModel.id,
+            UserModel.username,
+            UserModel.pat_fingerprint,
+            UserConfig.id.label("config_id"),
+            *CONFIG_COLUMNS
+        )
+        .outerjoin(UserModel.config)
+        .where(UserModel.pat_fingerprint == fingerprint)
+    )
+    row = result.first()
+    if not row or not hmac.compare_digest(row.pat_fingerprint, fingerprint):
+        return None
+    config = None
+    if row.config_id is not None:
+        config = {
+            "azure_devops_org": row.azure_devops_org,
+            "azure_devops_project": row.azure_devops_project,
+            "api_version": row.api_version
+        }
+    cached = CachedUser(row.id, row.username, row.pat_fingerprint, config)
+    user_cache.set(fingerprint, cached)
+    return cached
 
 
-def create_user(db: Session, user: UserCreate) -> UserModel:
-    hashed_password = get_password_hash(user.password)
+async def create_user(db: AsyncSession, user: UserCreate, executor: Optional[Executor] = None) -> UserModel:
+    # Argon2 is deliberately CPU-heavy; hash off the event loop so other requests keep flowing.
+    hashed_password = await asyncio.get_running_loop().run_in_executor(executor, get_password_hash, user.password)
     fingerprint = compute_pat_fingerprint(user.password)
-    db_user = UserModel(
-        username=user.username,
-        full_name=user.full_name,
-        hashed_password=hashed_password,
-        pat_fingerprint=fingerprint
+    # INSERT ... RETURNING hands back the created row (with its defaults) in the same round trip.
+    db_user = await db.scalar(
+        insert(UserModel).values(
+            username=user.username,
+            full_name=user.full_name,
+            hashed_password=hashed_password,
+            pat_fingerprint=fingerprint
+        ).returning(UserModel)
+    )
+    await db.commit()
+    user_cache.pop(fingerprint)
+    return db_user
+
+
+async def get_user_config_values(db: AsyncSession, user_id: int) -> Optional[Row]:
+    """
+    Read the non-secret configuration columns of a user, without loading the full UserConfig.
+    """
+    result = await db.execute(select(*CONFIG_COLUMNS).where(UserConfig.user_id == user_id))
+    return result.first()
+
+
+# Dialect-specific INSERTs that support ON CONFLICT, by dialect name.
+UPSERT_INSERTS = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}
+
+
+async def create_user_config(db: AsyncSession, user_id: int, values: dict) -> Row:
+    """
+    Insert a configuration for the user unless one exists, and return its non-secret
+    columns. RETURNING carries the new row; only when a concurrent request created the
+    configuration first (ON CONFLICT DO NOTHING) is the existing one read back.
+    """
+    dialect_insert = UPSERT_INSERTS[db.bind.dialect.name]
+    result = await db.execute(
+        dialect_insert(UserConfig)
+        .values(user_id=user_id, **values)
+        .on_conflict_do_nothing(index_elements=[UserConfig.user_id])
+        .returning(*CONFIG_COLUMNS)
+    )
+    row = result.first()
+    await db.commit()
+    if row is None:
+        row = await get_user_config_values(db, user_id)
+    return row
+
+
+async def update_user_config(db: AsyncSession, user_id: int, values: dict) -> Optional[Row]:
+    """
+    Update the given configuration fields and return the non-secret columns via RETURNING.
+    Returns None if the user has no configuration yet.
+    """
+    result = await db.execute(
+        update(UserConfig).where(UserConfig.user_id == user_id).values(**values).returning(*CONFIG_COLUMNS)
+    )
+    row = result.first()
+    await db.commit()
+    return row
+
+
+async def upsert_user_config(db: AsyncSession, user_id: int, values: dict) -> Row:
+    """
+    Create or overwrite the user's configuration in a single
+    INSERT ... ON CONFLICT (user_id) DO UPDATE ... RETURNING statement.
+    """
+    dialect_insert = UPSERT_INSERTS[db.bind.dialect.name]
+    result = await db.execute(
+        dialect_insert(UserConfig)
+        .values(user_id=user_id, **values)
+        .on_conflict_do_update(index_elements=[UserConfig.user_id], set_=values)
+        .returning(*CONFIG_COLUMNS)
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
\ No newline at end of file
+    row = result.one()
+    await db.commit()
+    return row
@@ -1,21 +1,28 @@
 # app/main.py
+import queue
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
-from fastapi import FastAPI, HTTPException, Depends, Body, Header, Path, Query
-from sqlalchemy.orm import Session
-import requests
+from fastapi import FastAPI, HTTPException, Depends, Body, Header, Path, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+import httpx
 
-from app.config import AZURE_DEVOPS_ORG, AZURE_DEVOPS_PROJECT, AZURE_DEVOPS_PAT, \
-    API_VERSION
+from app.config import Settings, get_settings
 from app.database import engine, Base, get_db
-from app.models import UserConfig
+from app.migrations import migrate_pat_fingerprints
 from app.schemas import User, UserCreate, WorkItemCreate, WorkItemUpdate, ConfigUpdate, Config
-from app.crud import get_user_by_username, create_user
-from app.auth import get_api_key
-from app.azure_devops import get_auth_headers, get_base_url
+from app.crud import get_user_by_username, create_user, get_user_config_values, create_user_config, \
+    update_user_config, upsert_user_config
+from app.cache import user_cache, work_item_cache, work_item_revs, config_cache, work_item_requests
+from app.auth import authenticate
+from app.azure_devops import get_auth_headers, get_base_url, get_http_client, get_in_chunks, \
+    escape_wiql_literal
 import logging
 
-from app.utils import transform_work_item
+from app.utils import transform_work_items, json_decoder, json_encoder, MsgspecJSONResponse, TRANSFORMED_FIELDS_PARAM, \
+    FieldsQuery, fields_query_param, etag_matches, encode_cursor, decode_cursor
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -24,213 +31,307 @@ logger.setLevel(logging.INFO)
 console_handler = logging.StreamHandler(sys.stdout)
 console_handler.setLevel(logging.INFO)
 
-# Create a file handler (optional)
-file_handler = logging.FileHandler("app.log")
-file_handler.setLevel(logging.INFO)
+# Create a file handler (optional), rotated so app.log doesn't grow unbounded.
+# delay=True defers opening app.log until the first record, so importing the app doesn't touch disk.
+file_handler = RotatingFileHandler("app.log", maxBytes=10 * 1024 * 1024, backupCount=5, delay=True)
+file_handler.setLevel(get_settings().log_file_level)
 
 # Define a log format
 formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
 console_handler.setFormatter(formatter)
 file_handler.setFormatter(formatter)
 
-# Add handlers to logger
-logger.addHandler(console_handler)
-logger.addHandler(file_handler)
-
-
-
-# Create tables (for demonstration; in production use Alembic migrations)
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(title="Azure DevOps Work Items API with Persistent User Management")
-
-
-
-# Helper function to retrieve user-level configuration from the database
-def get_user_config(current_user, db: Session):
-    config_record = db.query(UserConfig).filter(UserConfig.user_id == current_user.id).first()
-    if not config_record:
-        raise HTTPException(status_code=404, detail="No configuration found for the user.")
-    return {
-        "azure_devops_org": config_record.azure_devops_org,
-        "azure_devops_project": config_record.azure_devops_project,
-        "api_version": config_record.api_version
-    }
+# Route records through a queue so request handlers never block on stdout/file writes;
+# the listener thread (started with the app) does the actual I/O.
+log_queue = queue.Queue(-1)
+log_listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+# Replace any QueueHandler left by a previous import (importlib.reload): it would keep feeding
+# that import's queue, which nothing drains once this module's listener takes over.
+for handler in [h for h in logger.handlers if isinstance(h, QueueHandler)]:
+    logger.removeHandler(handler)
+logger.addHandler(QueueHandler(log_queue))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    log_listener.start()
+    # Upgrade existing tables and create missing ones (for demonstration; in production use
+    # Alembic migrations, or python -m app.migrations, and set RUN_MIGRATIONS=false so
+    # workers don't each issue DDL at startup)
+    if get_settings().run_migrations:
+        async with engine.begin() as conn:
+            await migrate_pat_fingerprints(conn)
+            await conn.run_sync(Base.metadata.create_all)
+    # One pooled HTTP/2 client shared by every request to Azure DevOps. The transport
+    # retries failed connection attempts (not responses), which are safe to repeat.
+    app.state.http = httpx.AsyncClient(
+        timeout=30,
+        transport=httpx.AsyncHTTPTransport(
+            http2=True,
+            retries=3,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+        )
+    )
+    # Dedicated threads for password hashing, so it neither blocks the event loop nor
+    # competes with FastAPI's shared threadpool.
+    app.state.password_hash_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="password-hash")
+    try:
+        yield
+    finally:
+        await app.state.http.aclose()
+        app.state.password_hash_pool.shutdown()
+        # Flushes any queued records before the process exits.
+        log_listener.stop()
+
+
+app = FastAPI(
+    title="Azure DevOps Work Items API with Persistent User Management",
+    default_response_class=MsgspecJSONResponse,
+    lifespan=lifespan
+)
+
+
+# Dependency to retrieve user-level configuration.
+# Served from config_cache, falling back to the configuration joined-loaded with the
+# authenticated user, so it never costs a query; FastAPI reuses it within a request.
+async def get_user_config(current_user=Depends(authenticate)) -> dict:
+    config = config_cache.get(current_user.id)
+    if config is None:
+        if not current_user.config:
+            raise HTTPException(status_code=404, detail="No configuration found for the user.")
+        config = current_user.config
+        config_cache.set(current_user.id, config)
+    return config
 
 
 # ---------------------------
 # User Management Endpoints
 # ---------------------------
 @app.post("/register", response_model=User, summary="Register a New User")
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    if get_user_by_username(db, user.username):
+async def register(request: Request, user: UserCreate, db: AsyncSession = Depends(get_db)):
+    if await get_user_by_username(db, user.username):
         raise HTTPException(status_code=400, detail="Username already registered")
-    return create_user(db, user)
+    return await create_user(db, user, request.app.state.password_hash_pool)
 
 
 # ---------------------------
 # Configuration Endpoints (User-Level)
 # ---------------------------
 @app.get("/config", summary="Get Current Azure DevOps Configuration", response_model=Config)
-def get_config(
-        current_user=Depends(get_api_key),
-        db: Session = Depends(get_db)
+async def get_config(
+        current_user=Depends(authenticate),
+        db: AsyncSession = Depends(get_db),
+        settings: Settings = Depends(get_settings)
 ):
     """
     Retrieve the current Azure DevOps configuration for the logged-in user.
     If no configuration exists for the user, a default config is created.
     """
-    config_record = db.query(UserConfig).filter(UserConfig.user_id == current_user.id).first()
-    if not config_record:
-        # Create a default configuration record for the user.
-        config_record = UserConfig(
-            user_id=current_user.id,
-            azure_devops_org=AZURE_DEVOPS_ORG,
-            azure_devops_project=AZURE_DEVOPS_PROJECT,
-            azure_devops_pat=AZURE_DEVOPS_PAT,
-            api_version=API_VERSION
-        )
-        db.add(config_record)
-        db.commit()
-        db.refresh(config_record)
-
-    return {
-        "azure_devops_org": config_record.azure_devops_org,
-        "azure_devops_project": config_record.azure_devops_project,
-        "api_version": config_record.api_version
-    }
+    cached = config_cache.get(current_user.id)
+    if cached is not None:
+        return cached
+
+    config_values = await get_user_config_values(db, current_user.id)
+    if config_values:
+        config = config_values._asdict()
+        config_cache.set(current_user.id, config)
+        return config
+
+    # Create a default configuration record for the user.
+    config_values = await create_user_config(db, current_user.id, {
+        "azure_devops_org": settings.azure_devops_org,
+        "azure_devops_project": settings.azure_devops_project,
+        "azure_devops_pat": settings.azure_devops_pat,
+        "api_version": settings.api_version
+    })
+    user_cache.pop(current_user.pat_fingerprint)
+    config = config_values._asdict()
+    config_cache.set(current_user.id, config)
+    return config
 
 
 @app.put("/config", summary="Update Azure DevOps Configuration", response_model=Config)
-def update_config(
+async def update_config(
         update: ConfigUpdate = Body(...),
-        current_user=Depends(get_api_key),
-        db: Session = Depends(get_db)
+        current_user=Depends(authenticate),
+        db: AsyncSession = Depends(get_db)
 ):
     """
     Update the Azure DevOps configuration for the logged-in user.
     Only the provided fields will be updated.
     If no configuration exists, it will only be created if all required fields are provided.
     """
-    config_record = db.query(UserConfig).filter(UserConfig.user_id == current_user.id).first()
-
-    if not config_record:
-        # Check if all required fields are provided for a new configuration.
-        if None in [
-            update.azure_devops_org,
-            update.azure_devops_project,
-            update.azure_devops_pat,
-            update.api_version
-        ]:
-            raise HTTPException(
-                status_code=400,
-                detail="All required fields must be provided to create a new configuration."
-            )
-        config_record = UserConfig(
-            user_id=current_user.id,
-            azure_devops_org=update.azure_devops_org,
-            azure_devops_project=update.azure_devops_project,
-            azure_devops_pat=update.azure_devops_pat,
-            api_version=update.api_version
-        )
-        db.add(config_record)
-        db.commit()
-        db.refresh(config_record)
+    provided = update.model_dump(exclude_none=True)
+    if update.is_complete:
+        # A complete configuration can be written whether or not one exists: one upsert.
+        config_values = await upsert_user_config(db, current_user.id, provided)
+    elif provided:
+        config_values = await update_user_config(db, current_user.id, provided)
     else:
-        if update.azure_devops_org is not None:
-            config_record.azure_devops_org = update.azure_devops_org
-        if update.azure_devops_project is not None:
-            config_record.azure_devops_project = update.azure_devops_project
-        if update.azure_devops_pat is not None:
-            config_record.azure_devops_pat = update.azure_devops_pat
-        if update.api_version is not None:
-            config_record.api_version = update.api_version
+        config_values = await get_user_config_values(db, current_user.id)
 
-        db.commit()
-        db.refresh(config_record)
+    if not config_values:
+        # A partial update needs an existing configuration to apply to.
+        raise HTTPException(
+            status_code=400,
+            detail="All required fields must be provided to create a new configuration."
+        )
 
-    return {
-        "azure_devops_org": config_record.azure_devops_org,
-        "azure_devops_project": config_record.azure_devops_project,
-        "api_version": config_record.api_version
-    }
+    user_cache.pop(current_user.pat_fingerprint)
+    config_cache.pop(current_user.id)
+    return config_values._asdict()
 
 
 # ---------------------------
 # Azure DevOps Work Items Endpoints (Protected)
 # ---------------------------
+# WIQL for every combination of (cursor, state, title). WIQL has no bind parameters
+# for literal values, so the escaped values are filled in with str.format.
+WIQL_VARIANTS = {
+    (has_cursor, has_state, has_title): (
+        "SELECT [System.Id], [System.Title], [System.State] "
+        "FROM WorkItems "
+        "WHERE [System.TeamProject] = @project"
+        + (" AND ([System.ChangedDate] < '{changed_date}'"
+           " OR ([System.ChangedDate] = '{changed_date}' AND [System.Id] < {last_id}))" if has_cursor else "")
+        # WIQL expects a literal string value enclosed in single quotes.
+        + (" AND [System.State] = '{state}'" if has_state else "")
+        # Use the CONTAINS operator for a keyword search.
+        + (" AND [System.Title] CONTAINS '{title}'" if has_title else "")
+        # System.Id breaks ties so the cursor is unambiguous.
+        + " ORDER BY [System.ChangedDate] DESC, [System.Id] DESC"
+    )
+    for has_cursor in (False, True)
+    for has_state in (False, True)
+    for has_title in (False, True)
+}
+
+
 @app.get("/workitems", summary="List Work Items")
-def list_work_items(
+async def list_work_items(
     state: str = Query(None, description="Filter by work item state (e.g., 'Active', 'Closed')"),
     title: str = Query(None, description="Keyword to search in the work item title"),
     limit: int = Query(200, ge=1, description="Maximum number of work items to return"),
-    offset: int = Query(0, ge=0, description="Offset for pagination"),
+    cursor: str = Query(None, description="nextCursor of the previous page, to continue after it"),
     x_pat: str = Header(None, alias="X-Azure-DevOps-PAT"),
-    current_user = Depends(get_api_key),
-    db: Session = Depends(get_db)
+    current_user=Depends(authenticate),
+    user_config: dict = Depends(get_user_config),
+    client: httpx.AsyncClient = Depends(get_http_client)
 ):
-    # Retrieve the user-level configuration
-    user_config = get_user_config(current_user, db)
     org = user_config["azure_devops_org"]
     project = user_config["azure_devops_project"]
     api_version = user_config["api_version"]
 
-    # Build the WIQL query dynamically.
-    # Base query:
-    wiql_query = (
-        "SELECT [System.Id], [System.Title], [System.State] "
-        "FROM WorkItems "
-        "WHERE [System.TeamProject] = @project"
+    # Continue after the last item of the previous page (keyset pagination).
+    last_changed_date, last_id = None, None
+    if cursor:
+        try:
+            last_changed_date, last_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+    # Pick the prebuilt query for this filter combination and fill in the escaped literals.
+    wiql_query = WIQL_VARIANTS[bool(cursor), bool(state), bool(title)].format(
+        changed_date=escape_wiql_literal(last_changed_date or ""),
+        last_id=last_id,
+        state=escape_wiql_literal(state or ""),
+        title=escape_wiql_literal(title or "")
     )
-    # Append filtering conditions if provided.
-    if state:
-        # WIQL expects a literal string value enclosed in single quotes.
-        wiql_query += f" AND [System.State] = '{state}'"
-    if title:
-        # Use the CONTAINS operator for a keyword search.
-        wiql_query += f" AND [System.Title] CONTAINS '{title}'"
-    # Add the ordering clause.
-    wiql_query += " ORDER BY [System.ChangedDate] DESC"
-    # Use TOP clause to limit the number of rows.
-    wiql_query = f"SELECT [System.Id], [System.Title], [System.State] FROM WorkItems WHERE [System.TeamProject] = @project"
-    if state:
-        wiql_query += f" AND [System.State] = '{state}'"
-    if title:
-        wiql_query += f" AND [System.Title] CONTAINS '{title}'"
-    wiql_query += " ORDER BY [System.ChangedDate] DESC"
 
     # Log the final WIQL query for debugging.
-    logger.info(f"WIQL Query: {wiql_query}")
+    logger.info("WIQL Query: %s", wiql_query)
 
-    # WIQL endpoint URL is project-scoped.
-    wiql_url = f"https://dev.azure.com/{org}/{project}/_apis/wit/wiql?$top={limit}&api-version={api_version}"
+    # WIQL endpoint URL is project-scoped. timePrecision makes date comparisons use the full timestamp.
+    wiql_url = (
+        f"https://dev.azure.com/{org}/{project}/_apis/wit/wiql"
+        f"?$top={limit}&timePrecision=true&api-version={api_version}"
+    )
     payload = {"query": wiql_query}
-    headers = get_auth_headers(x_pat)
-    response = requests.post(wiql_url, json=payload, headers=headers)
-    logger.info(f"Request to WIQL endpoint: {response.request.url}")
+    headers = get_auth_headers(x_pat, current_user.pat_fingerprint)
+    response = await client.post(wiql_url, json=payload, headers=headers)
+    logger.info("Request to WIQL endpoint: %s", response.request.url)
 
     if response.status_code != 200:
-        logger.error(f"Error retrieving work items: {response.text}")
+        logger.error("Error retrieving work items: %s", response.text)
         raise HTTPException(status_code=response.status_code, detail=response.text)
 
-    wiql_result = response.json()
+    wiql_result = json_decoder.decode(response.content)
     work_item_ids = [item["id"] for item in wiql_result.get("workItems", [])]
-    # Apply offset manually if needed:
-    work_item_ids = work_item_ids[offset:offset+limit]
 
     if work_item_ids:
-        ids = ",".join(map(str, work_item_ids))
         # Use the details endpoint including project in URL.
-        details_url = f"https://dev.azure.com/{org}/{project}/_apis/wit/workitems?ids={ids}&api-version={api_version}"
-        details_response = requests.get(details_url, headers=headers)
-        if details_response.status_code != 200:
-            logger.error(f"Error retrieving work item details: {details_response.status_code}: {details_response.text}")
-            raise HTTPException(status_code=details_response.status_code, detail=details_response.text)
-        details = details_response.json()  # assuming details contains a "value" key with list of items.
-        transformed = [transform_work_item(item) for item in details.get("value", [])]
-        return {"workItems": transformed}
+        # Azure DevOps caps ids= at 200, so larger pages are fetched as concurrent chunks.
+        details_responses = await get_in_chunks(
+            client,
+            lambda chunk: f"https://dev.azure.com/{org}/{project}/_apis/wit/workitems?ids={','.join(map(str, chunk))}"
+                          f"&fields={TRANSFORMED_FIELDS_PARAM}&api-version={api_version}",
+            work_item_ids,
+            headers
+        )
+        transformed = []
+        for details_response in details_responses:
+            if details_response.status_code != 200:
+                logger.error("Error retrieving work item details: %s: %s", details_response.status_code, details_response.text)
+                raise HTTPException(status_code=details_response.status_code, detail=details_response.text)
+            transformed.extend(transform_work_items(details_response.content))
+
+        # A full page means there may be more; hand back a cursor to the last item.
+        next_cursor = None
+        if len(work_item_ids) == limit and transformed:
+            last_item = transformed[-1]
+            # The cursor is a WIQL date literal; without a ChangedDate there is nothing to continue from.
+            if last_item.changedDate:
+                next_cursor = encode_cursor(last_item.changedDate, last_item.id)
+            else:
+                logger.warning("Work item %s has no System.ChangedDate; not returning a cursor", last_item.id)
+        # Returned as a response object so msgspec encodes the structs directly,
+        # skipping FastAPI's jsonable_encoder.
+        return MsgspecJSONResponse({"workItems": transformed, "nextCursor": next_cursor})
+
+    return MsgspecJSONResponse({"workItems": [], "nextCursor": None})
+
+
+# Declared before /workitems/{work_item_id} so "batch" is not captured as a work item ID.
+@app.get("/workitems/batch", summary="Get Multiple Work Items by IDs")
+async def get_work_items_batch(
+    ids: str = Query(..., description="Comma-separated list of work item IDs to retrieve"),
+    fields: FieldsQuery = None,
+    x_pat: str = Header(None, alias="X-Azure-DevOps-PAT"),
+    current_user=Depends(authenticate),
+    user_config: dict = Depends(get_user_config),
+    client: httpx.AsyncClient = Depends(get_http_client)
+):
+    """Retrieve multiple work items by their IDs along with web URLs."""
+    # Retrieve user configuration values
+    org = user_config["azure_devops_org"]
+    project = user_config["azure_devops_project"]
+    api_version = user_config["api_version"]
+    headers = get_auth_headers(x_pat, current_user.pat_fingerprint)
+    # Let Azure DevOps trim each item to the requested fields.
+    fields_param = fields_query_param(fields)
+
+    # Process work item IDs
+    work_item_ids = [id.strip() for id in ids.split(",")]
+    # Azure DevOps caps ids= at 200, so larger batches are fetched as concurrent chunks.
+    responses = await get_in_chunks(
+        client,
+        lambda chunk: f"https://dev.azure.com/{org}/_apis/wit/workitems?ids={','.join(chunk)}{fields_param}&api-version={api_version}",
+        work_item_ids,
+        headers
+    )
+    work_items = []
+    for response in responses:
+        if response.status_code != 200:
+            raise HTTPException(status_code=response.status_code, detail=response.text)
+        result = json_decoder.decode(response.content)
+        work_items.extend(result.get("value", []))
+
+    # Add web URLs to each work item
+    web_url_prefix = f"https://dev.azure.com/{org}/{project}/_workitems/edit/"
+    for work_item in work_items:
+        work_item["webUrl"] = web_url_prefix + str(work_item.get("id"))
+
+    return {"workItems": work_items}
 
-    return {"workItems": []}
 
 # @app.get("/workitems/{work_item_id}", summary="Get Work Item by ID")
 # def get_work_item(
@@ -249,72 +350,75 @@ def list_work_items(
 #         raise HTTPException(status_code=response.status_code, detail=response.text)
 #     return response.json()
 
+
 @app.get("/workitems/{work_item_id}", summary="Get Work Item by ID with Web URL")
-def get_work_item_info(
+async def get_work_item_info(
     work_item_id: int = Path(..., description="The ID of the work item to retrieve"),
+    fields: FieldsQuery = None,
     x_pat: str = Header(None, alias="X-Azure-DevOps-PAT"),
-    current_user=Depends(get_api_key),
-    db: Session = Depends(get_db)
-):
-    """Retrieve a single work item information along with its web URL."""
-    # Retrieve user configuration values
-    user_config = get_user_config(current_user, db)
-    org = user_config["azure_devops_org"]
-    project = user_config["azure_devops_project"]
-    api_version = user_config["api_version"]
-    headers = get_auth_headers(x_pat)
-
-    # Handle single work item using path parameter
-    url = f"https://dev.azure.com/{org}/_apis/wit/workitems/{work_item_id}?api-version={api_version}"
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        raise HTTPException(status_code=response.status_code, detail=response.text)
-    work_item = response.json()
-
-    # Add the web URL for the client
-    work_item["webUrl"] = f"https://dev.azure.com/{org}/{project}/_workitems/edit/{work_item_id}"
-    return work_item
-
-@app.get("/workitems/batch", summary="Get Multiple Work Items by IDs")
-def get_work_items_batch(
-    ids: str = Query(..., description="Comma-separated list of work item IDs to retrieve"),
-    x_pat: str = Header(None, alias="X-Azure-DevOps-PAT"),
-    current_user=Depends(get_api_key),
-    db: Session = Depends(get_db)
+    if_none_match: str = Header(None, alias="If-None-Match"),
+    current_user=Depends(authenticate),
+    user_config: dict = Depends(get_user_config),
+    client: httpx.AsyncClient = Depends(get_http_client)
 ):
-    """Retrieve multiple work items by their IDs along with web URLs."""
+    """
+    Retrieve a single work item information along with its web URL.
+    The response carries a weak ETag built from the work item's id and rev; a matching
+    If-None-Match gets an empty 304 instead of the body.
+    """
     # Retrieve user configuration values
-    user_config = get_user_config(current_user, db)
     org = user_config["azure_devops_org"]
     project = user_config["azure_devops_project"]
     api_version = user_config["api_version"]
-    headers = get_auth_headers(x_pat)
-
-    # Process work item IDs
-    work_item_ids = [id.strip() for id in ids.split(",")]
-    batch_url = f"https://dev.azure.com/{org}/_apis/wit/workitems?ids={','.join(work_item_ids)}&api-version={api_version}"
-    response = requests.get(batch_url, headers=headers)
-    if response.status_code != 200:
-        raise HTTPException(status_code=response.status_code, detail=response.text)
-
-    result = response.json()
-    work_items = result.get("value", [])
-
-    # Add web URLs to each work item
-    for work_item in work_items:
-        item_id = work_item.get("id")
-        work_item["webUrl"] = f"https://dev.azure.com/{org}/{project}/_workitems/edit/{item_id}"
+    cache_key = (current_user.id, org, project, work_item_id)
+    # Only full work items are cached, so update_work_item can invalidate them by ID;
+    # projections are fetched each time, coalesced under their own key.
+    work_item = work_item_cache.get(cache_key) if not fields else None
+    # Ignore a cached copy older than the latest update made through this API (possibly
+    # by another user, whose update could only evict their own cache entry).
+    if work_item is not None and work_item.get("rev", 0) < work_item_revs.get((org, work_item_id), 0):
+        work_item = None
+
+    async def fetch_work_item():
+        headers = get_auth_headers(x_pat, current_user.pat_fingerprint)
+
+        # Handle single work item using path parameter
+        url = (
+            f"https://dev.azure.com/{org}/_apis/wit/workitems/{work_item_id}"
+            f"?api-version={api_version}{fields_query_param(fields)}"
+        )
+        response = await client.get(url, headers=headers)
+        if response.status_code != 200:
+            raise HTTPException(status_code=response.status_code, detail=response.text)
+        work_item = json_decoder.decode(response.content)
+
+        # Add the web URL for the client
+        work_item["webUrl"] = f"https://dev.azure.com/{org}/{project}/_workitems/edit/{work_item_id}"
+        # A fetch that was already in flight when an update landed returns the old rev;
+        # don't cache it over the invalidation.
+        if not fields and work_item.get("rev", 0) >= work_item_revs.get((org, work_item_id), 0):
+            work_item_cache.set(cache_key, work_item)
+        return work_item
+
+    if work_item is None:
+        # Concurrent requests for the same work item share a single Azure DevOps call.
+        work_item = await work_item_requests.run(cache_key + (fields,), fetch_work_item)
+
+    # rev increases on every change, so it identifies this version of the work item.
+    etag = f'W/"{work_item.get("id")}:{work_item.get("rev")}"'
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return MsgspecJSONResponse(work_item, headers={"ETag": etag})
 
-    return {"workItems": work_items}
 
 @app.post("/workitems", summary="Create a Work Item")
-def create_work_item(
+async def create_work_item(
         item: WorkItemCreate = Body(...),
         x_pat: str = Header(None, alias="X-Azure-DevOps-PAT"),
-        current_user=Depends(get_api_key),
-        db: Session = Depends(get_db)
+        current_user=Depends(authenticate),
+        user_config: dict = Depends(get_user_config),
+        client: httpx.AsyncClient = Depends(get_http_client)
 ):
-    user_config = get_user_config(current_user, db)
     API_VERSION = user_config["api_version"]
     base_url = get_base_url(user_config)
     url = f"{base_url}/_apis/wit/workitems/$Task?api-version={API_VERSION}"
@@ -322,92 +426,69 @@ def create_work_item(
         {"op": "add", "path": "/fields/System.Title", "value": item.title},
         {"op": "add", "path": "/fields/System.Description", "value": item.description}
     ]
-    headers = get_auth_headers(x_pat)
+    headers = get_auth_headers(x_pat, current_user.pat_fingerprint)
     headers["Content-Type"] = "application/json-patch+json"
-    logger.info(f"Creating work item with payload: {payload} and url: {url}")
-    response = requests.patch(url, json=payload, headers=headers)
+    logger.info("Creating work item with payload: %s and url: %s", payload, url)
+    response = await client.patch(url, content=json_encoder.encode(payload), headers=headers)
     if response.status_code not in (200, 201):
-        logger.error(f"Error creating work item: {response.text}")
+        logger.error("Error creating work item: %s", response.text)
         raise HTTPException(status_code=response.status_code, detail=response.text)
-    return response.json()
+    return json_decoder.decode(response.content)
 
 
 @app.patch("/workitems/{work_item_id}", summary="Update a Work Item")
-def update_work_item(
+async def update_work_item(
     work_item_id: int = Path(..., description="The ID of the work item to update"),
     update: WorkItemUpdate = Body(...),
     x_pat: str = Header(None, alias="X-Azure-DevOps-PAT"),
-    current_user=Depends(get_api_key),
-    db: Session = Depends(get_db)
+    current_user=Depends(authenticate),
+    user_config: dict = Depends(get_user_config),
+    client: httpx.AsyncClient = Depends(get_http_client)
 ):
     """
-    Update only the specified fields of a work item. This endpoint verifies that
-    the work item exists and then builds a JSON Patch payload that uses "replace"
-    if a field already exists or "add" if it doesn't. Additionally, it ensures the
-    work item gets tagged as "enhanced".
+    Update only the specified fields of a work item. The JSON Patch payload uses
+    "add" for every field, which Azure DevOps applies as a set whether or not the
+    field already has a value, so no prior GET of the work item is needed. The
+    "enhanced" tag is always added as well; Azure DevOps merges tag additions
+    into the existing tag list.
     """
+    if not update.title and not update.description:
+        raise HTTPException(status_code=400, detail="No fields provided for update.")
+
     # Retrieve user configuration values.
-    user_config = get_user_config(current_user, db)
     org = user_config["azure_devops_org"]
+    project = user_config["azure_devops_project"]
     API_VERSION = user_config["api_version"]
+    headers = get_auth_headers(x_pat, current_user.pat_fingerprint)
 
-    # Step 1: Verify the work item exists.
-    get_url = f"https://dev.azure.com/{org}/_apis/wit/workitems/{work_item_id}?api-version={API_VERSION}"
-    headers = get_auth_headers(x_pat)
-    get_response = requests.get(get_url, headers=headers)
-    if get_response.status_code != 200:
-        raise HTTPException(
-            status_code=get_response.status_code,
-            detail="Work item not found or unavailable"
-        )
-    current_work_item = get_response.json()
-    fields = current_work_item.get("fields", {})
-
-    # Step 2: Build the patch payload dynamically.
+    # Build the patch payload.
     patch_payload = []
-
-    # Update the title field.
     if update.title:
-        op = "replace" if "System.Title" in fields else "add"
         patch_payload.append({
-            "op": op,
+            "op": "add",
             "path": "/fields/System.Title",
             "value": update.title
         })
-
-    # Update the description field.
     if update.description:
-        op = "replace" if "System.Description" in fields else "add"
         patch_payload.append({
-            "op": op,
+            "op": "add",
             "path": "/fields/System.Description",
             "value": update.description
         })
+    patch_payload.append({
+        "op": "add",
+        "path": "/fields/System.Tags",
+        "value": "enhanced"
+    })
 
-    # Add the "enhanced" tag.
-    # System.Tags is stored as a semicolon-separated string.
-    existing_tags = fields.get("System.Tags", "")
-    # Split existing tags and remove any extra whitespace.
-    tags_list = [tag.strip() for tag in existing_tags.split(";") if tag.strip()] if existing_tags else []
-    # Check case-insensitively if the "enhanced" tag is already present.
-    if "enhanced" not in [tag.lower() for tag in tags_list]:
-        tags_list.append("enhanced")
-        new_tags_value = "; ".join(tags_list)
-        op = "replace" if existing_tags else "add"
-        patch_payload.append({
-            "op": op,
-            "path": "/fields/System.Tags",
-            "value": new_tags_value
-        })
-
-    if not patch_payload:
-        raise HTTPException(status_code=400, detail="No fields provided for update.")
-
-    # Step 3: Send the PATCH request using the organization-level URL.
+    # Send the PATCH request using the organization-level URL.
     update_url = f"https://dev.azure.com/{org}/_apis/wit/workitems/{work_item_id}?api-version={API_VERSION}"
     headers["Content-Type"] = "application/json-patch+json"
-    patch_response = requests.patch(update_url, json=patch_payload, headers=headers)
+    patch_response = await client.patch(update_url, content=json_encoder.encode(patch_payload), headers=headers)
     if patch_response.status_code != 200:
         raise HTTPException(status_code=patch_response.status_code, detail=patch_response.text)
 
-    return patch_response.json()
\ No newline at end of file
+    updated_work_item = json_decoder.decode(patch_response.content)
+    work_item_revs.set((org, work_item_id), updated_work_item.get("rev", 0))
+    work_item_cache.pop((current_user.id, org, project, work_item_id))
+    return updated_work_item
\ No newline at end of file
@@ -0,0 +1,55 @@
+# app/migrations.py
+import asyncio
+
+from sqlalchemy import LargeBinary, inspect, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.database import engine
+from app.utils import fingerprint_pat_digest
+
+
+async def migrate_pat_fingerprints(conn: AsyncConnection) -> int:
+    """
+    Convert users.pat_fingerprint from the old VARCHAR of unkeyed SHA-256 hex digests to
+    the keyed 32-byte fingerprint, in place: each stored digest is keyed with
+    fingerprint_pat_digest, so existing users keep authenticating with the same PAT.
+    Idempotent; returns the number of rows converted.
+    """
+    def get_column_type(sync_conn):
+        inspector = inspect(sync_conn)
+        if not inspector.has_table("users"):
+            return None
+        return next(
+            (column["type"] for column in inspector.get_columns("users") if column["name"] == "pat_fingerprint"),
+            None
+        )
+
+    column_type = await conn.run_sync(get_column_type)
+    if column_type is None or isinstance(column_type, LargeBinary):
+        return 0
+
+    result = await conn.execute(text("SELECT id, pat_fingerprint FROM users"))
+    # SQLite keeps the declared VARCHAR type after conversion, so old rows are told apart by value.
+    legacy_rows = [(user_id, digest) for user_id, digest in result if isinstance(digest, str)]
+
+    if conn.dialect.name == "postgresql":
+        # The hex digests decode to 32 bytes, so the unique index holds throughout.
+        await conn.execute(text(
+            "ALTER TABLE users ALTER COLUMN pat_fingerprint TYPE bytea USING decode(pat_fingerprint, 'hex')"
+        ))
+    if legacy_rows:
+        await conn.execute(
+            text("UPDATE users SET pat_fingerprint = :fingerprint WHERE id = :id"),
+            [{"id": user_id, "fingerprint": fingerprint_pat_digest(digest)} for user_id, digest in legacy_rows]
+        )
+    return len(legacy_rows)
+
+
+async def run_migrations() -> None:
+    async with engine.begin() as conn:
+        await migrate_pat_fingerprints(conn)
+
+
+if __name__ == "__main__":
+    # One-off run for deployments with RUN_MIGRATIONS=false: python -m app.migrations
+    asyncio.run(run_migrations())
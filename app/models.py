@@ -1,5 +1,5 @@
 # app/models.py
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, LargeBinary
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -11,20 +11,30 @@ class UserModel(Base):
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, unique=True, index=True, nullable=False)
     full_name = Column(String, nullable=True)
-    pat_fingerprint = Column(String, unique=True, index=True, nullable=False)
+    # Unique btree index: PAT authentication is a single index probe on this column.
+    # Databases from before the HMAC fingerprint have a VARCHAR column holding unkeyed
+    # SHA-256 hex digests, which create_all does not alter; app.migrations converts them
+    # in place (at startup, or with python -m app.migrations).
+    pat_fingerprint = Column(LargeBinary(32), unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     disabled = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    # One-to-one relationship with UserConfig
-    config = relationship("UserConfig", back_populates="user", uselist=False)
+    # One-to-one relationship with UserConfig. Users are read as column projections that
+    # outer-join it (crud.get_user_by_pat_cached), never loaded through it, so any lazy
+    # load (an N+1 in disguise) raises instead of silently adding queries.
+    config = relationship("UserConfig", back_populates="user", uselist=False, lazy="raise")
 
 
 class UserConfig(Base):
     __tablename__ = "user_configs"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=False)
+    # unique + index creates a single unique btree index (ix_user_configs_user_id), so the
+    # per-request config lookup is an index probe. On an existing database, create it with
+    #   CREATE UNIQUE INDEX CONCURRENTLY ix_user_configs_user_id ON user_configs (user_id);
+    # so the build does not block writes.
+    user_id = Column(Integer, ForeignKey("users.id"), unique=True, index=True, nullable=False)
     azure_devops_org = Column(String, default="your-org")
     azure_devops_project = Column(String, default="your-project")
     azure_devops_pat = Column(String, default="your-pat")
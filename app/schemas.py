@@ -1,5 +1,5 @@
 # app/schemas.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 
 # User schemas
@@ -15,7 +15,9 @@ class User(BaseModel):
 class UserCreate(BaseModel):
     username: str
     full_name: Optional[str] = None
-    password: str
+    # The Azure DevOps PAT. Users are authenticated by a fast keyed digest of it, which is
+    # only safe for long random tokens (Azure DevOps PATs are 52+ characters).
+    password: str = Field(..., min_length=32)
 
 
 # Configuration schemas
@@ -34,6 +36,13 @@ class ConfigUpdate(BaseModel):
     azure_devops_pat: Optional[str] = None
     api_version: Optional[str] = None
 
+    @property
+    def is_complete(self) -> bool:
+        """
+        Whether every field is provided, i.e. the update can create a configuration on its own.
+        """
+        return None not in (self.azure_devops_org, self.azure_devops_project, self.azure_devops_pat, self.api_version)
+
 # Token schema
 class Token(BaseModel):
     access_token: str
@@ -1,33 +1,198 @@
 # app/utils.py
+import base64
 import hashlib
+import hmac
+from typing import Annotated, List, Optional, Tuple
+from urllib.parse import quote
 
-from passlib.context import CryptContext
+import bcrypt
+import msgspec
+from argon2 import PasswordHasher, Type
+from argon2.exceptions import InvalidHashError, VerificationError
+from fastapi import Query
+from fastapi.responses import JSONResponse
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.config import get_settings
+
+# New hashes use Argon2id (time_cost=2, 19 MiB, one lane: the OWASP baseline). bcrypt
+# hashes ("$2...") from before the switch are still verified with the bcrypt package.
+password_hasher = PasswordHasher(time_cost=2, memory_cost=19 * 1024, parallelism=1, type=Type.ID)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    if hashed_password.startswith("$2"):
+        return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+    try:
+        return password_hasher.verify(hashed_password, plain_password)
+    except (VerificationError, InvalidHashError):
+        return False
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
-
-def compute_pat_fingerprint(pat: str) -> str:
-    return hashlib.sha256(pat.encode("utf-8")).hexdigest()
-
-
-def transform_work_item(raw_item: dict) -> dict:
-    fields = raw_item.get("fields", {})
-    assigned_to = fields.get("System.AssignedTo", {})
-    return {
-        "id": raw_item.get("id"),
-        "title": fields.get("System.Title"),
-        "description": fields.get("System.Description"),
-        "state": fields.get("System.State"),
-        "createdDate": fields.get("System.CreatedDate"),
-        "assignedTo": {
-            "displayName": assigned_to.get("displayName"),
-            "uniqueName": assigned_to.get("uniqueName"),
-            "avatarUrl": assigned_to.get("_links", {}).get("avatar", {}).get("href")
-        },
-        "url": raw_item.get("url")
-    }
\ No newline at end of file
+    return password_hasher.hash(password)
+
+def compute_pat_fingerprint(pat: str) -> bytes:
+    """
+    Keyed HMAC-SHA256 fingerprint of a PAT. A fast digest is only adequate because
+    UserCreate requires long PATs, like the ones Azure DevOps issues; it is not a
+    substitute for a slow hash of short user-chosen passwords.
+    """
+    return fingerprint_pat_digest(hashlib.sha256(pat.encode("utf-8")).hexdigest())
+
+def fingerprint_pat_digest(pat_digest: str) -> bytes:
+    """
+    Key an unkeyed SHA-256 hex digest of a PAT, the form pat_fingerprint was stored in
+    before it became an HMAC, so existing rows can be converted without the raw PATs.
+    """
+    return hmac.new(get_settings().secret_key.encode("utf-8"), pat_digest.encode("ascii"), hashlib.sha256).digest()
+
+
+# The only work item fields read by transform_work_items; passed to Azure DevOps as
+# fields= so it does not send the full field set of every item.
+TRANSFORMED_FIELDS_PARAM = ",".join((
+    "System.Id",
+    "System.Title",
+    "System.Description",
+    "System.State",
+    "System.CreatedDate",
+    "System.ChangedDate",
+    "System.AssignedTo"
+))
+
+
+# Optional fields= projection of the single and batch work item endpoints, declared once
+# so both accept and document it identically.
+FieldsQuery = Annotated[Optional[str], Query(
+    description="Comma-separated Azure DevOps field reference names to return "
+                "(e.g. 'System.Title,System.State'); all fields when omitted"
+)]
+
+
+def fields_query_param(fields: Optional[str]) -> str:
+    """
+    The &fields=... query string that asks Azure DevOps for only the given fields,
+    or an empty string for all of them.
+    """
+    return f"&fields={quote(fields, safe=',')}" if fields else ""
+
+
+class AdoAvatar(msgspec.Struct):
+    href: Optional[str] = None
+
+
+class AdoIdentityLinks(msgspec.Struct):
+    avatar: AdoAvatar = msgspec.field(default_factory=AdoAvatar)
+
+
+class AdoIdentity(msgspec.Struct):
+    displayName: Optional[str] = None
+    uniqueName: Optional[str] = None
+    links: AdoIdentityLinks = msgspec.field(default_factory=AdoIdentityLinks, name="_links")
+
+
+class AdoFields(msgspec.Struct):
+    title: Optional[str] = msgspec.field(default=None, name="System.Title")
+    description: Optional[str] = msgspec.field(default=None, name="System.Description")
+    state: Optional[str] = msgspec.field(default=None, name="System.State")
+    created_date: Optional[str] = msgspec.field(default=None, name="System.CreatedDate")
+    changed_date: Optional[str] = msgspec.field(default=None, name="System.ChangedDate")
+    assigned_to: AdoIdentity = msgspec.field(default_factory=AdoIdentity, name="System.AssignedTo")
+
+
+class AdoWorkItem(msgspec.Struct):
+    id: int
+    url: Optional[str] = None
+    fields: AdoFields = msgspec.field(default_factory=AdoFields)
+
+
+class AdoWorkItemBatch(msgspec.Struct):
+    value: List[AdoWorkItem] = []
+
+
+class AssignedTo(msgspec.Struct):
+    displayName: Optional[str]
+    uniqueName: Optional[str]
+    avatarUrl: Optional[str]
+
+
+class WorkItem(msgspec.Struct):
+    """
+    A work item as returned by the list endpoint, built by transform_work_items.
+    """
+    id: int
+    title: Optional[str]
+    description: Optional[str]
+    state: Optional[str]
+    createdDate: Optional[str]
+    changedDate: Optional[str]
+    assignedTo: AssignedTo
+    url: Optional[str]
+
+
+work_item_batch_decoder = msgspec.json.Decoder(AdoWorkItemBatch)
+# The app's one JSON codec: Azure DevOps responses, outgoing payloads and our own responses.
+json_decoder = msgspec.json.Decoder()
+json_encoder = msgspec.json.Encoder()
+
+
+class MsgspecJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered by msgspec, which also encodes WorkItem structs directly.
+    """
+
+    def render(self, content) -> bytes:
+        return json_encoder.encode(content)
+
+
+def transform_work_items(content: bytes) -> List[WorkItem]:
+    """
+    Reshape the work items of a details response for the list endpoint: decodes the
+    raw body straight into structs and builds WorkItem structs from them, without
+    building intermediate dicts.
+    """
+    return [
+        WorkItem(
+            id=raw_item.id,
+            title=fields.title,
+            description=fields.description,
+            state=fields.state,
+            createdDate=fields.created_date,
+            changedDate=fields.changed_date,
+            assignedTo=AssignedTo(
+                displayName=fields.assigned_to.displayName,
+                uniqueName=fields.assigned_to.uniqueName,
+                avatarUrl=fields.assigned_to.links.avatar.href
+            ),
+            url=raw_item.url
+        )
+        for raw_item in work_item_batch_decoder.decode(content).value
+        for fields in (raw_item.fields,)
+    ]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header against an ETag, as HTTP requires for it:
+    W/ prefixes are ignored on both sides, and "*" matches any current representation.
+    """
+    if not if_none_match:
+        return False
+    opaque_tag = etag.removeprefix("W/")
+    return any(
+        tag == "*" or tag.removeprefix("W/") == opaque_tag
+        for tag in (tag.strip() for tag in if_none_match.split(","))
+    )
+
+
+def encode_cursor(changed_date: str, work_item_id: int) -> str:
+    """
+    Opaque pagination cursor pointing at the last work item of a page.
+    """
+    return base64.urlsafe_b64encode(f"{changed_date}|{work_item_id}".encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Inverse of encode_cursor. Raises ValueError (or a subclass) for malformed cursors.
+    """
+    decoded = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+    changed_date, work_item_id = decoded.rsplit("|", 1)
+    return changed_date, int(work_item_id)